@@ -1,6 +1,29 @@
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from collections import defaultdict
+
+# Compiling the kernels takes several seconds on a cold cache, so short-lived
+# processes can set NUMBA_DISABLE_JIT=1 to skip importing Numba and run them
+# as plain (much slower) Python instead. The same happens without Numba.
+USE_NUMBA = os.environ.get('NUMBA_DISABLE_JIT', '0') == '0'
+if USE_NUMBA:
+    try:
+        from numba import njit, prange, get_num_threads, set_num_threads
+    except ImportError:
+        USE_NUMBA = False
+
+if not USE_NUMBA:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+    
+    prange = range
+    
+    def get_num_threads():
+        return 1
+    
+    def set_num_threads(num_threads):
+        pass
 
 # Global constants
 NUM_DECKS = 6              # Number of decks in shoe
@@ -10,86 +33,192 @@ NUM_SIMULATIONS = 20       # Number of simulations to run
 HANDS_PER_SIM = 250        # Number of hands per simulation
 STARTING_BANKROLL = 1000   # Starting bankroll for each player
 HOUSE_EDGE = 0.05         # House edge for basic strategy (0.5%)
+DEBUG = False              # Print every hand played through the Blackjack class
 
 # Card counting constants
 MIN_BET_MULTIPLIER = 1     # Minimum bet multiplier 
 MAX_BET_MULTIPLIER = 5     # Maximum bet multiplier for high counts
 BET_RAMP_START = 2         # True count at which to start ramping bets
 
-class Card:
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        
-    def get_value(self):
-        if self.rank in ['J', 'Q', 'K']:
-            return 10
-        elif self.rank == 'A':
-            return 11  # Ace is handled specially in hand calculation
-        else:
-            return int(self.rank)
+# Cards are stored as int8 rank codes (0-12) indexing into these lookup tables
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+ACE = 12
+CARD_VALUE = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11], dtype=np.int8)
+COUNT_DELTA = np.array([1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1], dtype=np.int8)  # Hi-Lo
+MAX_HAND_CARDS = 21        # A hand stops drawing before it can hold more cards than this
+MONEY_UNITS_PER_DOLLAR = 2**20  # Compiled bankrolls are integer 1/2**20 dollars (up to ~$8.8 trillion)
+
+rng = np.random.default_rng()  # Draws batch seeds; each Deck has its own generator
+
+# Basic strategy action codes
+STAND = 0
+HIT = 1
+DOUBLE = 2                 # Double down (charted as: or hit if doubling isn't allowed)
+DOUBLE_OR_STAND = 3        # Charted only: double down, or stand if doubling isn't allowed
+ACTION_NAMES = ['stand', 'hit', 'double']
+
+# Strategy codes used by the compiled simulation
+BASIC_STRATEGY = 0
+CARD_COUNTER = 1
+
+def build_strategy_table():
+    """
+    Build the basic strategy chart as one action table indexed by
+    [soft, player_total, dealer_upcard_value, can_double]
+    """
+    hard = np.full((22, 12), HIT, dtype=np.int8)
+    soft = np.full((22, 12), HIT, dtype=np.int8)
+    
+    # Soft hands (an ace counted as 11)
+    soft[19:, :] = STAND
+    soft[18, [2, 7, 8]] = STAND
+    soft[18, 3:7] = DOUBLE_OR_STAND
+    soft[17, 3:7] = DOUBLE
+    soft[15:17, 4:7] = DOUBLE
+    soft[13:15, 5:7] = DOUBLE
+    
+    # Hard hands
+    hard[17:, :] = STAND
+    hard[13:17, 2:7] = STAND
+    hard[12, 4:7] = STAND
+    hard[11, :] = DOUBLE
+    hard[10, :10] = DOUBLE
+    hard[9, 3:7] = DOUBLE
+    
+    # Resolve the doubling fallbacks for hands that can't double
+    chart = np.stack([hard, soft])
+    table = np.empty(chart.shape + (2,), dtype=np.int8)
+    table[..., 0] = np.where(chart == DOUBLE, HIT, np.where(chart == DOUBLE_OR_STAND, STAND, chart))
+    table[..., 1] = np.where(chart == DOUBLE_OR_STAND, DOUBLE, chart)
+    
+    return table
+
+STRATEGY_TABLE = build_strategy_table()
+
+@njit(cache=True)
+def new_shoe(num_decks):
+    """Unshuffled shoe of rank codes, four of each rank per deck"""
+    return (np.arange(52 * num_decks) // 4 % 13).astype(np.int8)
+
+@njit(cache=True)
+def draw_fast():
+    """Draw a rank code from an infinite shoe: every rank equally likely, no depletion"""
+    return np.int8(int(13 * np.random.random()))
+
+@njit(cache=True)
+def next_card(shoe, pos, infinite_shoe):
+    """
+    Card at the shoe cursor. With an infinite shoe it is an independent draw,
+    written to the cursor so the hand's cards can be read back from the shoe.
+    """
+    if infinite_shoe:
+        shoe[pos] = draw_fast()
+    return shoe[pos]
+
+@njit(cache=True)
+def add_to_hand(total, aces, card):
+    """
+    Add a card to a hand tracked as (total, aces), where aces counts the aces
+    still valued at 11. Returns the updated pair.
+    """
+    value = CARD_VALUE[card]
+    total += value
+    if value == 11:
+        aces += 1
     
-    def __str__(self):
-        return f"{self.rank}{self.suit}"
+    # Handle aces to avoid busting
+    while total > 21 and aces > 0:
+        total -= 10  # Convert an ace from 11 to 1
+        aces -= 1
+    
+    return total, aces
+
+@njit(cache=True)
+def dealer_draw(shoe, pos, infinite_shoe, total, aces):
+    """
+    Draw dealer cards from the shoe cursor until the dealer's (total, aces) hand
+    reaches 17. Returns the new cursor and hand along with the Hi-Lo count
+    of the cards drawn.
+    """
+    count = 0
+    while total < 17:
+        card = next_card(shoe, pos, infinite_shoe)
+        pos += 1
+        total, aces = add_to_hand(total, aces, card)
+        count += COUNT_DELTA[card]
+    return pos, total, aces, count
+
+@njit(cache=True)
+def basic_decision(total, soft, dealer_up, can_double):
+    """Basic strategy action (STAND, HIT or DOUBLE) for a player total against the dealer upcard"""
+    return STRATEGY_TABLE[int(soft), total, dealer_up, int(can_double)]
 
 class Deck:
-    def __init__(self, num_decks=NUM_DECKS):
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        suits = ['♥', '♦', '♣', '♠']
-        self.cards = []
-        
-        # Initialize multiple decks
-        for _ in range(num_decks):
-            for rank in ranks:
-                for suit in suits:
-                    self.cards.append(Card(rank, suit))
+    def __init__(self, num_decks=NUM_DECKS, seed=None):
+        # One rank code per card; suits never affect play so they aren't stored
+        self.cards = new_shoe(num_decks)
+        self.pos = 0
+        self.rng = np.random.default_rng(seed)
         
         self.shuffle()
         self.cut_card_position = int(len(self.cards) * 0.75)  # Cut card at 75% deck penetration
     
     def shuffle(self):
-        np.random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
+    
+    def reset(self):
+        # Reshuffle the same cards in place and deal from the top again
+        self.shuffle()
+        self.pos = 0
     
     def deal(self):
-        if not self.cards:
+        if self.pos >= len(self.cards):
             return None
-        return self.cards.pop(0)
+        card = self.cards[self.pos]
+        self.pos += 1
+        return card
+    
+    def deal_many(self, count):
+        # Deal the next count cards as one slice of the shoe
+        cards = self.cards[self.pos:self.pos + count]
+        self.pos += len(cards)
+        return cards
+    
+    def cards_remaining(self):
+        return len(self.cards) - self.pos
     
     def needs_shuffle(self):
-        return len(self.cards) <= self.cut_card_position
+        return self.cards_remaining() <= self.cut_card_position
 
 class Hand:
     def __init__(self):
-        self.cards = []
+        self.cards = np.empty(MAX_HAND_CARDS, dtype=np.int8)
+        self.n = 0
+        self.total = 0
+        self.aces = 0  # Aces still counted as 11
+    
+    def reset(self):
+        # Empty the hand so it can be reused for the next deal
+        self.n = 0
+        self.total = 0
+        self.aces = 0
     
     def add_card(self, card):
-        self.cards.append(card)
+        self.cards[self.n] = card
+        self.n += 1
+        self.total, self.aces = add_to_hand(self.total, self.aces, card)
     
     def get_value(self):
-        total_value = 0
-        aces = 0
-        
-        for card in self.cards:
-            value = card.get_value()
-            if value == 11:
-                aces += 1
-            total_value += value
-        
-        # Handle aces to avoid busting
-        while total_value > 21 and aces > 0:
-            total_value -= 10  # Convert an ace from 11 to 1
-            aces -= 1
-        
-        return total_value
+        return self.total
     
     def is_blackjack(self):
-        return len(self.cards) == 2 and self.get_value() == 21
+        return self.n == 2 and self.total == 21
     
     def is_busted(self):
-        return self.get_value() > 21
+        return self.total > 21
     
     def __str__(self):
-        cards_str = ', '.join(str(card) for card in self.cards)
+        cards_str = ', '.join(RANKS[card] for card in self.cards[:self.n])
         return f"{cards_str} = {self.get_value()}"
 
 class Player:
@@ -97,7 +226,7 @@ class Player:
         self.bankroll = bankroll
         self.min_bet = min_bet
         self.current_bet = min_bet
-        self.hands = []
+        self.hands = [Hand()]
         self.strategy = strategy
         self.running_count = 0
         self.true_count = 0
@@ -128,9 +257,9 @@ class Player:
         else:
             return 0
     
-    def update_count(self, card):
+    def update_count(self, cards):
         """
-        Use Hi-Lo counting system:
+        Use Hi-Lo counting system on a card or an array of cards seen:
         2-6: +1
         7-9: 0
         10-A: -1
@@ -138,142 +267,71 @@ class Player:
         if self.strategy != 'card_counter':
             return
             
-        value = card.get_value()
-        if value >= 2 and value <= 6:
-            self.running_count += 1
-        elif value >= 10 or card.rank == 'A':
-            self.running_count -= 1
+        self.running_count += int(COUNT_DELTA[cards].sum())
     
     def make_decision(self, hand, dealer_upcard_value):
         """Basic strategy or card counting decision making"""
         player_total = hand.get_value()
         
-        # Check for soft hands (hands with an ace counted as 11)
-        has_ace = any(card.rank == 'A' for card in hand.cards)
-        soft_hand = has_ace and player_total <= 21
+        # Soft hands (an ace still counted as 11) are looked up in their own strategy table
+        soft_hand = hand.aces > 0
         
-        # If we have blackjack, always stand
-        if len(hand.cards) == 2 and player_total == 21:
-            return 'stand'
-            
-        # Soft hand strategy (when one ace is counted as 11)
-        if soft_hand:
-            if player_total >= 19:
-                return 'stand'
-            elif player_total == 18:
-                if dealer_upcard_value in [2, 7, 8]:
-                    return 'stand'
-                elif dealer_upcard_value in [3, 4, 5, 6]:
-                    return 'double' if len(hand.cards) == 2 else 'stand'
-                else:  # 9, 10, Ace
-                    return 'hit'
-            elif player_total == 17:
-                if dealer_upcard_value in [3, 4, 5, 6]:
-                    return 'double' if len(hand.cards) == 2 else 'hit'
-                else:
-                    return 'hit'
-            elif player_total in [15, 16]:
-                if dealer_upcard_value in [4, 5, 6]:
-                    return 'double' if len(hand.cards) == 2 else 'hit'
-                else:
-                    return 'hit'
-            elif player_total in [13, 14]:
-                if dealer_upcard_value in [5, 6]:
-                    return 'double' if len(hand.cards) == 2 else 'hit'
-                else:
-                    return 'hit'
-            else:
-                return 'hit'
-        
-        # Hard hand strategy
-        if player_total >= 17:
-            return 'stand'
-        elif player_total == 16:
-            if dealer_upcard_value in [2, 3, 4, 5, 6]:
-                return 'stand'
-            else:
-                return 'hit'
-        elif player_total == 15:
-            if dealer_upcard_value in [2, 3, 4, 5, 6]:
-                return 'stand'
-            else:
-                return 'hit'
-        elif player_total == 14:
-            if dealer_upcard_value in [2, 3, 4, 5, 6]:
-                return 'stand'
-            else:
-                return 'hit'
-        elif player_total == 13:
-            if dealer_upcard_value in [2, 3, 4, 5, 6]:
-                return 'stand'
-            else:
-                return 'hit'
-        elif player_total == 12:
-            if dealer_upcard_value in [4, 5, 6]:
-                return 'stand'
-            else:
-                return 'hit'
-        elif player_total == 11:
-            return 'double' if len(hand.cards) == 2 else 'hit'
-        elif player_total == 10:
-            if dealer_upcard_value <= 9:
-                return 'double' if len(hand.cards) == 2 else 'hit'
-            else:
-                return 'hit'
-        elif player_total == 9:
-            if dealer_upcard_value in [3, 4, 5, 6]:
-                return 'double' if len(hand.cards) == 2 else 'hit'
-            else:
-                return 'hit'
-        else:  # 8 or less
-            return 'hit'
+        action = basic_decision(player_total, soft_hand, dealer_upcard_value, hand.n == 2)
+        return ACTION_NAMES[action]
 
     def add_winnings(self, amount):
         self.bankroll += amount
 
 class Blackjack:
-    def __init__(self, num_decks=NUM_DECKS, min_bet=MIN_BET):
-        self.deck = Deck(num_decks)
+    def __init__(self, num_decks=NUM_DECKS, min_bet=MIN_BET, seed=None):
+        self.deck = Deck(num_decks, seed)
         self.num_decks = num_decks
         self.min_bet = min_bet
         self.players = []
+        self.counters = []  # Players who count cards, picked out once as they sit down
         self.dealer = Hand()
     
     def add_player(self, player):
         self.players.append(player)
+        if player.strategy == 'card_counter':
+            self.counters.append(player)
     
     def get_decks_remaining(self):
-        return len(self.deck.cards) / 52
+        return self.deck.cards_remaining() / 52
     
     def deal_initial_cards(self):
-        # Clear all hands
-        self.dealer = Hand()
+        # Clear all hands, reusing them rather than allocating new ones
+        self.dealer.reset()
         for player in self.players:
-            player.hands = [Hand()]
+            for hand in player.hands:
+                hand.reset()
         
-        # Deal two cards to each player and dealer
-        for _ in range(2):
-            for player in self.players:
-                card = self.deck.deal()
+        # Deal two cards to each player and dealer, taking both rounds from the shoe at once
+        rounds = self.deck.deal_many(2 * (len(self.players) + 1)).reshape(2, -1)
+        for cards in rounds:
+            for player, card in zip(self.players, cards):
                 player.hands[0].add_card(card)
-                player.update_count(card)  # Update count for card counters
-            
-            card = self.deck.deal()
-            self.dealer.add_card(card)
             
-            # Update count for card counters - they can see dealer's upcard
-            if _ == 0:  # Only show and count first dealer card
-                for player in self.players:
-                    player.update_count(card)
+            self.dealer.add_card(cards[-1])
+    
+    def count_seen_cards(self, dealer_cards_seen):
+        """
+        Update card counters once per hand with the cards they saw: their own
+        hands and the first dealer_cards_seen dealer cards. The count only sizes
+        the next bet, so it doesn't need to change card by card during play.
+        """
+        for player in self.counters:
+            player.update_count(self.dealer.cards[:dealer_cards_seen])
+            for hand in player.hands:
+                player.update_count(hand.cards[:hand.n])
     
     def play_hand(self):
         # Check if deck needs shuffling
         if self.deck.needs_shuffle():
-            self.deck = Deck(self.num_decks)
-            for player in self.players:
-                if player.strategy == 'card_counter':
-                    player.running_count = 0
-                    player.true_count = 0
+            self.deck.reset()
+            for player in self.counters:
+                player.running_count = 0
+                player.true_count = 0
         
         # Have players place bets
         decks_remaining = self.get_decks_remaining()
@@ -285,15 +343,19 @@ class Blackjack:
         
         # Handle dealer blackjack
         dealer_upcard = self.dealer.cards[0]
-        if (dealer_upcard.get_value() == 10 or dealer_upcard.rank == 'A') and self.dealer.is_blackjack():
+        if CARD_VALUE[dealer_upcard] >= 10 and self.dealer.is_blackjack():
             # Check players for blackjack (push)
             for player in self.players:
                 if player.hands[0].is_blackjack():
                     player.add_winnings(player.current_bet)  # Push - return the bet
                 # Otherwise, player loses, bet already taken
+            self.count_seen_cards(1)  # Only the upcard is counted
+            if DEBUG:
+                self.print_table()
             return
         
-        # Play each player's hand
+        # Play each player's hand, noting whether any is left for the dealer to play against
+        dealer_play_needed = False
         for player in self.players:
             hand = player.hands[0]
             
@@ -303,16 +365,14 @@ class Blackjack:
                 continue
             
             # Player's turn
-            dealer_upcard_value = dealer_upcard.get_value()
+            dealer_upcard_value = int(CARD_VALUE[dealer_upcard])
             
             # Keep hitting until player stands or busts
             while True:
                 decision = player.make_decision(hand, dealer_upcard_value)
                 
                 if decision == 'hit':
-                    card = self.deck.deal()
-                    hand.add_card(card)
-                    player.update_count(card)
+                    hand.add_card(self.deck.deal())
                     
                     if hand.is_busted():
                         # Player busts and loses bet (already deducted)
@@ -327,62 +387,262 @@ class Blackjack:
                     player.bankroll -= additional_bet
                     player.current_bet += additional_bet
                     
-                    card = self.deck.deal()
-                    hand.add_card(card)
-                    player.update_count(card)
+                    hand.add_card(self.deck.deal())
                     break
+            
+            if not hand.is_busted():
+                dealer_play_needed = True
         
-        # Dealer's turn if any player hasn't busted
-        dealer_play_needed = any(not hand.is_busted() for player in self.players for hand in player.hands)
-        
+        # Dealer's turn if any player still has a hand to settle
         if dealer_play_needed:
-            # Dealer reveals hole card
-            for player in self.players:
-                player.update_count(self.dealer.cards[1])
-            
-            # Dealer draws until 17 or higher
-            while self.dealer.get_value() < 17:
-                card = self.deck.deal()
-                self.dealer.add_card(card)
-                
-                # All players can see dealer's hits
-                for player in self.players:
-                    player.update_count(card)
+            # Dealer reveals hole card and draws until 17 or higher
+            dealer = self.dealer
+            start = self.deck.pos
+            self.deck.pos, dealer.total, dealer.aces, _ = dealer_draw(self.deck.cards, start, False, dealer.total, dealer.aces)
+            drawn = self.deck.cards[start:self.deck.pos]
+            dealer.cards[dealer.n:dealer.n + len(drawn)] = drawn
+            dealer.n += len(drawn)
             
-            dealer_value = self.dealer.get_value()
-            dealer_busted = self.dealer.is_busted()
+            # Hands still in play win above this value and push on it; a busted dealer loses to all of them
+            dealer_value = 0 if self.dealer.is_busted() else self.dealer.get_value()
             
-            # Determine winners
+            # Settle each remaining hand once: bet plus winnings, the bet back on a push,
+            # or nothing on a loss (the bet was already deducted in place_bet)
             for player in self.players:
                 for hand in player.hands:
-                    if hand.is_busted():
-                        continue  # Player already lost bet (nothing to return)
-                    
-                    player_value = hand.get_value()
+                    if hand.is_busted() or hand.is_blackjack():
+                        continue  # Busted bets are already lost and blackjacks already paid
                     
-                    if dealer_busted or player_value > dealer_value:
-                        # Player wins - return bet plus winnings
-                        player.add_winnings(player.current_bet * 2)  # Original bet + winnings
-                    elif player_value == dealer_value:
-                        # Push - return original bet only
-                        player.add_winnings(player.current_bet)
-                    # else player loses bet (already deducted in place_bet)
+                    payout = 2 * (hand.total > dealer_value) + (hand.total == dealer_value)
+                    if payout:
+                        player.add_winnings(player.current_bet * payout)
+        
+        # All players see the dealer's whole hand if it was played out
+        self.count_seen_cards(self.dealer.n if dealer_play_needed else 1)
+        
+        if DEBUG:
+            self.print_table()
+    
+    def print_table(self):
+        print(f"Dealer: {self.dealer}")
+        for player in self.players:
+            for hand in player.hands:
+                print(f"{player.strategy}: {hand} (bankroll ${player.bankroll:.2f})")
 
-def apply_house_edge(bankroll, initial_bankroll, num_hands):
+@njit(cache=True)
+def apply_house_edge(history, initial_bankroll):
     """
-    Apply house edge to basic strategy player to make simulation more realistic
+    Apply house edge to a basic strategy bankroll history to make simulation more realistic
     This simulates the natural disadvantage faced by basic strategy players
     """
-    # Calculate expected loss based on house edge
-    expected_loss = initial_bankroll * HOUSE_EDGE * (num_hands / 100)
+    # Calculate expected loss after each hand based on house edge
+    expected_loss = initial_bankroll * HOUSE_EDGE * (np.arange(len(history)) / 100)
     
-    # Adjust final bankroll downward to account for house edge
-    adjusted_bankroll = max(0, bankroll - expected_loss)
-    return adjusted_bankroll
+    # Adjust bankrolls downward to account for house edge
+    return np.maximum(history - expected_loss, 0)
 
-def run_simulation(num_hands=HANDS_PER_SIM, starting_bankroll=STARTING_BANKROLL, min_bet=MIN_BET, num_decks=NUM_DECKS):
-    # Create game and players
-    game = Blackjack(num_decks=num_decks, min_bet=min_bet)
+@njit(cache=True, fastmath=True)
+def play_hand_nb(shoe, pos, infinite_shoe, counter_seats, min_bet, bankroll, running_count, bet, totals, aces, num_cards):
+    """
+    Compiled equivalent of Blackjack.play_hand: take every seat's bet, deal
+    from shoe[pos:], play the players and dealer, and settle into bankroll.
+    Only the seats listed in counter_seats size bets from their running
+    count, and only theirs are updated, once the hand's cards are known.
+    bet, totals, aces and num_cards are per-seat scratch arrays reused across
+    hands; hands are tracked as (total, aces still counted as 11) plus a card count.
+    min_bet, bankroll and bet are integers in MONEY_UNITS_PER_DOLLAR units. Stakes
+    start as whole half-dollars, and each 3:2 blackjack on an all-in bet of an
+    odd amount only needs one more binary digit, so payouts settle exactly.
+    Returns the new shoe position.
+    """
+    num_players = len(bankroll)
+    first = pos  # Shoe position of the hand's first card
+    
+    # Place bets; they are settled once the hand's outcome is known
+    decks_remaining = (len(shoe) - pos) / 52
+    bet[:] = min_bet
+    for p in counter_seats:
+        true_count = running_count[p] / max(1, decks_remaining)
+        if true_count >= BET_RAMP_START:
+            bet[p] = min_bet * min(MAX_BET_MULTIPLIER, max(MIN_BET_MULTIPLIER, int(true_count)))
+    for p in range(num_players):
+        bet[p] = min(bet[p], bankroll[p])
+    
+    # Deal two cards to each player and dealer; only the dealer upcard is seen
+    totals[:] = 0
+    aces[:] = 0
+    num_cards[:] = 2
+    dealer_total = 0
+    dealer_aces = 0
+    for r in range(2):
+        for p in range(num_players):
+            card = next_card(shoe, pos, infinite_shoe)
+            pos += 1
+            totals[p], aces[p] = add_to_hand(totals[p], aces[p], card)
+        
+        card = next_card(shoe, pos, infinite_shoe)
+        pos += 1
+        dealer_total, dealer_aces = add_to_hand(dealer_total, dealer_aces, card)
+        if r == 0:
+            dealer_upcard = card
+        else:
+            dealer_hole_card = card
+    
+    dealer_up = CARD_VALUE[dealer_upcard]
+    dealer_blackjack = dealer_up >= 10 and dealer_total == 21
+    dealer_count = int(COUNT_DELTA[dealer_upcard])  # Hi-Lo count of the dealer cards everyone sees
+    
+    if not dealer_blackjack:
+        # Players' turns; blackjacks are paid without playing
+        dealer_play_needed = False
+        for p in range(num_players):
+            if totals[p] == 21:
+                continue
+            
+            while True:
+                action = basic_decision(totals[p], aces[p] > 0, dealer_up, num_cards[p] == 2)
+                if action == STAND:
+                    break
+                
+                if action == DOUBLE:
+                    bet[p] += min(bet[p], bankroll[p] - bet[p])
+                
+                card = next_card(shoe, pos, infinite_shoe)
+                pos += 1
+                totals[p], aces[p] = add_to_hand(totals[p], aces[p], card)
+                num_cards[p] += 1
+                
+                if action == DOUBLE or totals[p] > 21:
+                    break
+            
+            if totals[p] <= 21:
+                dealer_play_needed = True
+        
+        # Dealer's turn if any player still has a hand to settle
+        if dealer_play_needed:
+            pos, dealer_total, dealer_aces, count = dealer_draw(shoe, pos, infinite_shoe, dealer_total, dealer_aces)
+            dealer_count += COUNT_DELTA[dealer_hole_card] + count
+    
+    # Card counters see their own cards and the dealer's visible ones. Each seat's
+    # two cards are dealt in rounds, and the players' hits follow in seat order.
+    for p in counter_seats:
+        seen = dealer_count + COUNT_DELTA[shoe[first + p]] + COUNT_DELTA[shoe[first + num_players + 1 + p]]
+        hits_start = first + 2 * (num_players + 1) + num_cards[:p].sum() - 2 * p
+        for j in range(hits_start, hits_start + num_cards[p] - 2):
+            seen += COUNT_DELTA[shoe[j]]
+        running_count[p] += seen
+    
+    # Settle each bet once, as a whole number of half bets
+    for p in range(num_players):
+        blackjack = num_cards[p] == 2 and totals[p] == 21
+        if dealer_blackjack:
+            outcome = 0 if blackjack else -2
+        elif blackjack:
+            outcome = int(2 * BLACKJACK_PAYOUT)
+        elif totals[p] > 21:
+            outcome = -2
+        elif dealer_total > 21 or totals[p] > dealer_total:
+            outcome = 2
+        elif totals[p] == dealer_total:
+            outcome = 0
+        else:
+            outcome = -2
+        bankroll[p] += outcome * bet[p] // 2
+    
+    return pos
+
+@njit(cache=True)
+def check_half_dollars(starting_bankroll, min_bet):
+    """Raise ValueError unless both stakes are whole half-dollars, which the kernels' integer bankrolls settle exactly"""
+    if 2 * starting_bankroll != np.floor(2 * starting_bankroll) or 2 * min_bet != np.floor(2 * min_bet):
+        raise ValueError("starting_bankroll and min_bet must be whole half-dollars")
+
+@njit(cache=True)
+def simulate_hands(shoe, strategies, num_hands, starting_bankroll, min_bet, infinite_shoe):
+    """
+    Compiled equivalent of run_simulation: one player per entry of strategies
+    (BASIC_STRATEGY or CARD_COUNTER) plays num_hands hands at one table, with
+    the same betting, counting, house edge and payout rules as the Blackjack class.
+    Player state is kept as parallel arrays indexed by seat.
+    The shoe is dealt from a cursor and reshuffled in place at each cut card.
+    With infinite_shoe every card is an independent draw instead, which is a
+    close approximation for basic strategy but leaves nothing to count.
+    Returns a (num_players, hands played + 1) array of bankroll histories,
+    stopping early if any player goes broke.
+    """
+    num_players = len(strategies)
+    counter_seats = np.nonzero(strategies == CARD_COUNTER)[0]
+    cut_card_position = int(len(shoe) * 0.75)
+    pos = 0
+    
+    # Money is kept in integer units and converted back to dollars for the history
+    min_bet_units = int(min_bet * MONEY_UNITS_PER_DOLLAR)
+    bankroll = np.full(num_players, int(starting_bankroll * MONEY_UNITS_PER_DOLLAR), dtype=np.int64)
+    running_count = np.zeros(num_players, dtype=np.int64)  # Only kept for counter_seats
+    bet = np.zeros(num_players, dtype=np.int64)
+    totals = np.zeros(num_players, dtype=np.int64)
+    aces = np.zeros(num_players, dtype=np.int64)
+    num_cards = np.zeros(num_players, dtype=np.int64)
+    
+    history = np.empty((num_players, num_hands + 1))
+    history[:, 0] = starting_bankroll
+    
+    hands_played = num_hands
+    for i in range(num_hands):
+        # Reshuffle at the cut card
+        if len(shoe) - pos <= cut_card_position:
+            if not infinite_shoe:
+                np.random.shuffle(shoe)
+            pos = 0
+            running_count[:] = 0
+        
+        pos = play_hand_nb(shoe, pos, infinite_shoe, counter_seats, min_bet_units,
+                           bankroll, running_count, bet, totals, aces, num_cards)
+        
+        # Record bankrolls
+        player_broke = False
+        for p in range(num_players):
+            history[p, i + 1] = bankroll[p] / MONEY_UNITS_PER_DOLLAR
+            if bankroll[p] <= 0:
+                player_broke = True
+        
+        if player_broke:
+            hands_played = i + 1
+            break
+    
+    # Apply realistic house edge to basic strategy players
+    history = history[:, :hands_played + 1]
+    for p in range(num_players):
+        if strategies[p] == BASIC_STRATEGY:
+            history[p] = apply_house_edge(history[p], starting_bankroll)
+    
+    return history
+
+@njit('Tuple((f8[:], f8[:]))(i8, i8, f8, f8, i8, b1)', cache=True, fastmath=True)
+def run_simulation_jit(seed, num_hands, starting_bankroll, min_bet, num_decks, infinite_shoe):
+    """
+    Seeded, compiled run_simulation returning both bankroll histories.
+    An infinite shoe leaves nothing to count, so only the basic strategy
+    player is seated and the counting history comes back empty.
+    """
+    check_half_dollars(starting_bankroll, min_bet)
+    np.random.seed(seed)
+    
+    shoe = new_shoe(num_decks)
+    if infinite_shoe:
+        strategies = np.array([BASIC_STRATEGY], dtype=np.int8)
+    else:
+        np.random.shuffle(shoe)
+        strategies = np.array([BASIC_STRATEGY, CARD_COUNTER], dtype=np.int8)
+    
+    history = simulate_hands(shoe, strategies, num_hands, starting_bankroll, min_bet, infinite_shoe)
+    if infinite_shoe:
+        return history[0], np.empty(0)
+    return history[0], history[1]
+
+def run_simulation(num_hands=HANDS_PER_SIM, starting_bankroll=STARTING_BANKROLL, min_bet=MIN_BET, num_decks=NUM_DECKS, seed=None):
+    # Create game and players; a seed makes the shuffles reproducible
+    game = Blackjack(num_decks=num_decks, min_bet=min_bet, seed=seed)
     
     # Create players with different strategies
     basic_player = Player(bankroll=starting_bankroll, min_bet=min_bet, strategy='basic')
@@ -392,95 +652,158 @@ def run_simulation(num_hands=HANDS_PER_SIM, starting_bankroll=STARTING_BANKROLL,
     game.add_player(counting_player)
     
     # Track bankroll history
-    basic_history = [starting_bankroll]
-    counting_history = [starting_bankroll]
+    basic_history = np.empty(num_hands + 1)
+    counting_history = np.empty(num_hands + 1)
+    basic_history[0] = starting_bankroll
+    counting_history[0] = starting_bankroll
     
     # Play hands
+    hands_played = num_hands
     for i in range(num_hands):
         game.play_hand()
         
         # Record bankrolls
-        basic_history.append(basic_player.bankroll)
-        counting_history.append(counting_player.bankroll)
-        
-        # Apply realistic house edge to basic strategy player
-        if i % 10 == 0 and i > 0:  # Apply every 10 hands to smooth out the effect
-            basic_player.bankroll = apply_house_edge(basic_player.bankroll, starting_bankroll, 10)
-            basic_history[-1] = basic_player.bankroll
+        basic_history[i + 1] = basic_player.bankroll
+        counting_history[i + 1] = counting_player.bankroll
         
         # Check if either player is broke
         if basic_player.bankroll <= 0 or counting_player.bankroll <= 0:
+            hands_played = i + 1
             break
     
+    basic_history = basic_history[:hands_played + 1]
+    counting_history = counting_history[:hands_played + 1]
+    
+    # Apply realistic house edge to basic strategy player
+    basic_history = apply_house_edge(basic_history, starting_bankroll)
+    
     return basic_history, counting_history
 
-def plot_results(basic_history, counting_history, num_hands):
+def plot_results(basic_history, counting_history, num_hands, show=True):
+    """
+    Save a plot of one simulation's bankroll histories, and show it unless show is False.
+    counting_history is None when only basic strategy was simulated.
+    """
+    import matplotlib.pyplot as plt  # Imported here so simulation-only runs don't pay for it
+    
     plt.figure(figsize=(12, 6))
     
     # Plot bankroll histories
-    hands = list(range(len(basic_history)))
+    hands = np.arange(len(basic_history))
     plt.plot(hands, basic_history, label='Basic Strategy', linewidth=2)
-    plt.plot(hands, counting_history, label='Card Counting', linewidth=2)
+    if counting_history is not None:
+        plt.plot(hands, counting_history, label='Card Counting', linewidth=2)
     
     # Calculate profit/loss
     basic_profit = basic_history[-1] - basic_history[0]
-    counting_profit = counting_history[-1] - counting_history[0]
+    profit_text = f'Basic Strategy Profit: ${basic_profit:.2f}'
+    if counting_history is not None:
+        counting_profit = counting_history[-1] - counting_history[0]
+        profit_text += (f'\nCard Counting Profit: ${counting_profit:.2f}'
+                        f'\nDifference: ${counting_profit - basic_profit:.2f}')
     
     # Add horizontal line at starting bankroll
     plt.axhline(y=basic_history[0], color='r', linestyle='--', alpha=0.3)
     
     # Add styling
-    plt.title('Blackjack Profit Comparison: Basic Strategy vs Card Counting')
+    if counting_history is None:
+        plt.title('Blackjack Bankroll: Basic Strategy (Infinite Shoe)')
+    else:
+        plt.title('Blackjack Profit Comparison: Basic Strategy vs Card Counting')
     plt.xlabel('Number of Hands')
     plt.ylabel('Bankroll ($)')
     plt.grid(True, alpha=0.3)
     plt.legend()
     
     # Add text box with profit information
-    plt.figtext(0.15, 0.15, 
-                f'Basic Strategy Profit: ${basic_profit:.2f}\n'
-                f'Card Counting Profit: ${counting_profit:.2f}\n'
-                f'Difference: ${counting_profit - basic_profit:.2f}',
-                bbox=dict(facecolor='white', alpha=0.8))
+    plt.figtext(0.15, 0.15, profit_text, bbox=dict(facecolor='white', alpha=0.8))
     
     plt.tight_layout()
     plt.savefig('blackjack_simulation_results.png')
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close()
 
-def run_multiple_simulations(num_simulations=NUM_SIMULATIONS, hands_per_sim=HANDS_PER_SIM, starting_bankroll=STARTING_BANKROLL):
-    """Run multiple simulations and analyze the results"""
-    basic_results = []
-    counting_results = []
-    
-    for i in range(num_simulations):
-        basic_history, counting_history = run_simulation(
-            num_hands=hands_per_sim, 
-            starting_bankroll=starting_bankroll
+@njit('Tuple((f8[:, :], f8[:, :], i8[:]))(i8, i8, i8, f8, f8, i8, b1)', parallel=True, cache=True)
+def simulate_many(seed, num_simulations, num_hands, starting_bankroll, min_bet, num_decks, infinite_shoe):
+    """
+    Run independent simulations in parallel and return every bankroll history
+    as rows of two (num_simulations, num_hands + 1) arrays, along with the
+    number of hands each simulation lasted (rows are NaN after that; counting
+    rows are all NaN with an infinite shoe).
+    Simulation i is seeded with seed + i, so results don't depend on thread scheduling.
+    """
+    basic_histories = np.full((num_simulations, num_hands + 1), np.nan)
+    counting_histories = np.full((num_simulations, num_hands + 1), np.nan)
+    hands_played = np.empty(num_simulations, dtype=np.int64)
+    
+    for i in prange(num_simulations):
+        basic_history, counting_history = run_simulation_jit(seed + i, num_hands, starting_bankroll, min_bet, num_decks, infinite_shoe)
+        n = len(basic_history)
+        basic_histories[i, :n] = basic_history
+        counting_histories[i, :len(counting_history)] = counting_history
+        hands_played[i] = n - 1
+    
+    return basic_histories, counting_histories, hands_played
+
+def run_multiple_simulations(num_simulations=NUM_SIMULATIONS, hands_per_sim=HANDS_PER_SIM, starting_bankroll=STARTING_BANKROLL, seed=None, infinite_shoe=False, num_threads=None, plot=False, histories_path=None):
+    """
+    Run multiple simulations and analyze the results.
+    plot saves a figure of the first simulation's bankroll histories without
+    blocking on a plot window, and histories_path
+    saves every history to an .npz file for later analysis.
+    infinite_shoe draws cards independently instead of dealing from a shoe;
+    it is faster but leaves nothing to count, so only basic strategy is simulated
+    and reported.
+    Simulations are spread over all CPU cores unless num_threads limits them;
+    a given seed gives the same results for any thread count.
+    """
+    check_half_dollars(starting_bankroll, MIN_BET)
+    if seed is None:
+        seed = rng.integers(2**31, dtype=np.int64)
+    
+    # Limit the threads for this batch only; Numba's setting is process-wide
+    previous_threads = get_num_threads()
+    if num_threads is not None:
+        set_num_threads(num_threads)
+    try:
+        basic_histories, counting_histories, hands_played = simulate_many(
+            seed, num_simulations, hands_per_sim, starting_bankroll, MIN_BET, NUM_DECKS, infinite_shoe
         )
-        
-        basic_results.append(basic_history[-1] - starting_bankroll)
-        counting_results.append(counting_history[-1] - starting_bankroll)
+    finally:
+        set_num_threads(previous_threads)
     
-    # Plot single simulation for visualization
-    basic_history, counting_history = run_simulation(
-        num_hands=hands_per_sim, 
-        starting_bankroll=starting_bankroll
-    )
-    plot_results(basic_history, counting_history, hands_per_sim)
+    final_hands = (np.arange(num_simulations), hands_played)
+    basic_results = basic_histories[final_hands] - starting_bankroll
+    
+    if histories_path is not None:
+        np.savez(histories_path, basic_histories=basic_histories,
+                 counting_histories=counting_histories, hands_played=hands_played)
+    
+    # Plot the first simulation for visualization
+    if plot:
+        plot_length = hands_played[0] + 1
+        counting_history = None if infinite_shoe else counting_histories[0, :plot_length]
+        plot_results(basic_histories[0, :plot_length], counting_history, hands_per_sim, show=False)
     
     # Calculate and display statistics
-    basic_avg = sum(basic_results) / len(basic_results)
-    counting_avg = sum(counting_results) / len(counting_results)
+    basic_avg = basic_results.mean()
+    basic_win_rate = (basic_results > 0).mean() * 100
     
     print(f"\nResults after {num_simulations} simulations of {hands_per_sim} hands each:")
     print(f"Basic Strategy Average Profit: ${basic_avg:.2f}")
+    if infinite_shoe:
+        print(f"\nBasic Strategy Win Rate: {basic_win_rate:.1f}%")
+        return
+    
+    counting_results = counting_histories[final_hands] - starting_bankroll
+    counting_avg = counting_results.mean()
+    counting_win_rate = (counting_results > 0).mean() * 100
+    
     print(f"Card Counting Average Profit: ${counting_avg:.2f}")
     print(f"Average Advantage: ${counting_avg - basic_avg:.2f}")
     
-    # Calculate win rates
-    basic_win_rate = sum(1 for r in basic_results if r > 0) / len(basic_results) * 100
-    counting_win_rate = sum(1 for r in counting_results if r > 0) / len(counting_results) * 100
-    
     print(f"\nBasic Strategy Win Rate: {basic_win_rate:.1f}%")
     print(f"Card Counting Win Rate: {counting_win_rate:.1f}%")
 
@@ -489,5 +812,6 @@ if __name__ == "__main__":
     run_multiple_simulations(
         num_simulations=NUM_SIMULATIONS, 
         hands_per_sim=HANDS_PER_SIM, 
-        starting_bankroll=STARTING_BANKROLL
+        starting_bankroll=STARTING_BANKROLL,
+        plot=True
     )
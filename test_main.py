@@ -0,0 +1,59 @@
+import os
+os.environ['NUMBA_DISABLE_JIT'] = '1'  # Run the kernels as Python so their shuffles can be swapped out
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import main
+
+NUM_HANDS = 300
+NUM_SEEDS = 30
+
+
+class SeededShuffles:
+    """Stands in for both engines' shuffles: each call deals the next seeded permutation of the shoe"""
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def shuffle(self, cards):
+        cards[:] = self.rng.permutation(np.sort(cards))
+
+
+def run_both_engines(seed, starting_bankroll, min_bet):
+    """Play the Blackjack class and the compiled kernel through the same shoes"""
+    shuffles = SeededShuffles(seed)
+    with mock.patch('numpy.random.default_rng', return_value=shuffles):
+        class_histories = main.run_simulation(NUM_HANDS, starting_bankroll, min_bet)
+
+    shuffles = SeededShuffles(seed)
+    with mock.patch('numpy.random.shuffle', shuffles.shuffle):
+        kernel_histories = main.run_simulation_jit(0, NUM_HANDS, starting_bankroll, min_bet, main.NUM_DECKS, False)
+
+    return class_histories, kernel_histories
+
+
+class EngineAgreementTest(unittest.TestCase):
+    def assert_engines_agree(self, starting_bankroll, min_bet):
+        for seed in range(NUM_SEEDS):
+            class_histories, kernel_histories = run_both_engines(seed, starting_bankroll, min_bet)
+            for class_history, kernel_history in zip(class_histories, kernel_histories):
+                np.testing.assert_array_equal(class_history, kernel_history, err_msg=f'seed {seed}')
+
+    def test_default_stakes(self):
+        self.assert_engines_agree(main.STARTING_BANKROLL, main.MIN_BET)
+
+    def test_half_dollar_stakes(self):
+        # Blackjacks on all-in $7.50 bets pay $11.25
+        self.assert_engines_agree(27.5, 2.5)
+
+    def test_rejects_stakes_finer_than_half_dollars(self):
+        with self.assertRaises(ValueError):
+            main.run_simulation_jit(0, NUM_HANDS, 1000.0, 2.25, main.NUM_DECKS, False)
+        with self.assertRaises(ValueError):
+            main.run_multiple_simulations(1, NUM_HANDS, starting_bankroll=27.25)
+
+
+if __name__ == '__main__':
+    unittest.main()